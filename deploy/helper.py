@@ -1,29 +1,320 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from datetime import datetime as dt
+from functools import lru_cache
+from itertools import repeat
+from logging.handlers import QueueHandler, QueueListener
+from urllib.parse import urlparse
+import gc
+import json
 import logging
 import os
+import queue
+import threading
 import time
 
 from dotenv import load_dotenv
+import httpx
+import lxml.etree
+import lxml.html
 import psycopg
+from psycopg_pool import ConnectionPool
 from selenium import webdriver
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+import tldextract
+
+log = logging.getLogger(__name__)
+
+# most of the scraping time is spent on tcp/tls handshakes and browser waits
+# a single pooled http client keeps connections alive between urls
+# so every reused connection skips the whole handshake
+#** http/2 also lets requests to the same host share one socket
+HTTP_CLIENT = httpx.Client(
+	limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+	http2=True,
+	timeout=30,
+	follow_redirects=True
+)
+
+# the attribute look-up of dt.now is paid once at import time
+# a micro saving, but the call sits in every scraping result
+_now = dt.now
+
+# based on the observations, pages having this many script tags
+# usually render their real content with javascript
+# those pages must be handled by the webdriver instead
+SCRIPT_TAG_THRESHOLD = 10
+
+# javascript snippets sent through execute_script are hoisted here
+# so the same string objects are reused across every call
+# instead of being rebuilt per url
+_JS_PAGE_READY_STATE = "return document.readyState"
+_JS_SCROLLBAR_PRESENT = (
+	"return document.documentElement.scrollHeight > document.documentElement.clientHeight"
+)
+_JS_SCROLL_TO_BOTTOM_IF_SCROLLABLE = (
+	"var h=document.documentElement;"
+	"if(h.scrollHeight>h.clientHeight){"
+	"window.scrollTo(0, document.body.scrollHeight);"
+	"return true;"
+	"}"
+	"return false;"
+)
+_JS_SCROLL_HEIGHT_STABLE = (
+	"var h=document.body.scrollHeight;"
+	"var stable=window.__prevScrollHeight===h;"
+	"window.__prevScrollHeight=h;"
+	"return stable;"
+)
+
+@lru_cache(maxsize=256)
+def compile_xpath(xpath: str) -> lxml.etree.XPath:
+	"""
+	Return the compiled lxml XPath object for the expression
+
+	Compiling the same expression again for every scraped page
+	is wasted work, thus the compiled object is memoized
+	and reused across urls
+
+		param:
+			xpath (str): XPath expression to compile
+
+		return:
+			compiled lxml XPath object
+	"""
+
+	return lxml.etree.XPath(xpath)
+
+@lru_cache(maxsize=256)
+def provide_locator(by: str, selector: str) -> tuple:
+	"""
+	Return the Selenium locator tuple for the selector
+
+	The tuple is memoized so repeated look-ups across urls
+	hand back the same object instead of building a new one
+
+		params:
+			by (str): Selenium locator strategy (By.*)
+			selector (str): selector the strategy applies to
+
+		return:
+			tuple: (by, selector) locator
+	"""
+
+	return (by, selector)
+
+def requires_js_rendering(page_source: str) -> bool:
+	"""
+	Check whether the page most likely needs javascript rendering
+
+		param:
+			page_source (str): HTML of the page fetched without a browser
+
+		return:
+			bool: whether the page is script-heavy
+	"""
+
+	return page_source.lower().count("<script")>=SCRIPT_TAG_THRESHOLD
+
+def fetch_static(web_url: str) -> str:
+	"""
+	Fetch the page's HTML through the pooled http client without the webdriver
+
+		param:
+			web_url (str): url of the web to fetch
+
+		return:
+			str: HTML of the page, \
+			or None when the page must be rendered by the webdriver
+	"""
+
+	response = HTTP_CLIENT.get(web_url)
+	response.raise_for_status()
+
+	# non-html responses and script-heavy pages
+	# can't be scraped without the browser
+	if("text/html" not in response.headers.get("content-type", "")):
+		return None
+
+	if(requires_js_rendering(response.text)):
+		return None
+
+	# whitespace- or comment-only bodies give lxml nothing to parse
+	# let the webdriver render the real document instead
+	try:
+		return compact_page_source(response.text)
+	except lxml.etree.ParserError:
+		return None
+
+def preflight_web_url(web_url: str) -> str:
+	"""
+	Check cheaply whether the url is worth scraping at all
+
+	A HEAD request through the pooled client reveals pdfs, images
+	and dead urls without spending any webdriver time on them
+
+		param:
+			web_url (str): url of the web to check
+
+		return:
+			str: reason the url should be skipped, \
+			or None when the url is scrapable
+	"""
+
+	response = HTTP_CLIENT.head(web_url, timeout=5)
+
+	if(response.status_code>=400):
+		return f"skipped: status {response.status_code}"
+
+	if("text/html" not in response.headers.get("content-type", "")):
+		return "skipped: non-html"
+
+	return None
+
+def compact_page_source(page_source: str) -> str:
+	"""
+	Shrink the page's HTML before storing it in the scraping result
+
+	The raw page source is often megabytes per url
+	and most of it is scripts and styles
+	that carry no signal for the gambling classification,
+	thus the page is parsed once into lxml's C-backed tree
+	and re-serialized without those elements
+
+		param:
+			page_source (str): raw HTML of the page
+
+		return:
+			str: HTML of the page without its script and style elements
+	"""
+
+	if(not page_source):
+		return page_source
+
+	tree = lxml.html.fromstring(page_source)
+	lxml.etree.strip_elements(tree, "script", "style", with_tail=False)
+
+	return lxml.html.tostring(tree, encoding="unicode")
+
+def close_http_client() -> None:
+	"""
+	Close the pooled http client on shutdown
+	"""
+
+	HTTP_CLIENT.close()
+
+# the database credentials are provided through the environment
+load_dotenv()
+
+# opening a fresh postgres connection per query pays
+# a tcp + tls + auth round-trip every time,
+# the pool keeps warm authenticated connections ready for reuse instead
+DB_POOL_MIN_SIZE = 4
+DB_POOL_MAX_SIZE = 20
+
+_db_pool = None
+
+def get_db_pool() -> ConnectionPool:
+	"""
+	Return the shared database connection pool, creating it on first use
+
+	The pool is created lazily so importing the module
+	doesn't require the database to be reachable
+
+		return:
+			psycopg connection pool shared across the module
+	"""
+
+	global _db_pool
+
+	if(_db_pool is None):
+		_db_pool = ConnectionPool(
+			os.environ["DATABASE_URL"],
+			min_size=DB_POOL_MIN_SIZE,
+			max_size=DB_POOL_MAX_SIZE,
+			kwargs={"autocommit": True}
+		)
+
+	return _db_pool
+
+@contextmanager
+def get_db() -> psycopg.Connection:
+	"""
+	Provide a database connection taken from the pool
+
+	Call sites use `with get_db() as conn:` instead of psycopg.connect,
+	the connection goes back to the pool when the block exits
+
+		return:
+			psycopg connection taken from the pool
+	"""
+
+	with get_db_pool().connection() as conn:
+		yield conn
 
 def setup_logger(logging: logging) -> None:
 	"""
 	Setup logger with function name identifier
 
+	The records are dropped onto an in-memory queue and written out
+	by a background listener thread, so the scraping workers never
+	block on stdout i/o under the concurrent pool
+
 		param:
-			func_name (str): name of the function where the logger was executed
+			logging: the logging module to configure
 	"""
+
+	log_queue = queue.SimpleQueue()
+
+	stream_handler = logging.StreamHandler()
+
+	# the %-style template goes through logging's cached PercentStyle
+	# instead of re-running str.format machinery per record
+	#** also fixes the datefmt bug where %m stamped the minutes
+	# with the month number
+	stream_handler.setFormatter(logging.Formatter(
+		"%(asctime)s - (%(filename)s: %(funcName)s) -> %(message)s",
+		datefmt="%Y-%m-%d %H:%M:%S"
+	))
+
+	# the listener drains the queue on its own thread
+	# and is the only place the actual i/o happens
+	listener = QueueListener(log_queue, stream_handler)
+	listener.start()
+
+	# the record is fully formatted by the listener's handler
+	# the queue handler must pass it through untouched
+	# (basicConfig would otherwise attach its own formatter to it)
+	queue_handler = QueueHandler(log_queue)
+	queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
 	logging.basicConfig(
 		level=logging.DEBUG,
-		format="{asctime} - ({filename}: {funcName}) -> {message}",
-		style="{",
-		datefmt="%Y-%m-%d %H:%m:%S"
+		handlers=[queue_handler]
 	)
 
+@dataclass(slots=True, frozen=True)
+class ScrapeResult:
+	"""
+	Scraping report for one url
+
+	A slotted frozen dataclass is cheaper to construct and holds
+	about half the memory of the equivalent dict, which adds up
+	when tens of thousands of urls are scraped
+	"""
+
+	web_url: str
+	is_gambling_site: bool
+	is_error: bool
+	scraped_elements: str
+	scraping_initiation_time: dt
+	exception_raised: str
+
 def provide_scraping_result_dict(
 	web_url: str,
 	is_gambling_site: bool,
@@ -34,7 +325,7 @@ def provide_scraping_result_dict(
 ) -> dict:
 	"""
 	Return scraping report as a dictionary
-	
+
 		params:
 			web_url (str): URL of scraped website
 			is_gambling_site (bool): whether the site is a gambling site or not
@@ -42,19 +333,20 @@ def provide_scraping_result_dict(
 			scraped_elements (str): HTML elements of the web as string
 			scraping_initiation_time (datetime): datetime of the scraping initiation process
 			exception_raised (str): exception raised
-		
+
 		return:
-			dictionary containing the scraping report
-	"""
-	
-	return {
-		"web_url": web_url,
-		"is_gambling_site": is_gambling_site,
-		"is_error": is_error,
-		"scraped_elements": scraped_elements,
-		"scraping_initiation_time": scraping_initiation_time,
-		"exception_raised": exception_raised
-	}
+			dictionary containing the scraping report, \
+			adapted from :ScrapeResult:`ScrapeResult` for the dataframe consumers
+	"""
+
+	return asdict(ScrapeResult(
+		web_url=web_url,
+		is_gambling_site=is_gambling_site,
+		is_error=is_error,
+		scraped_elements=scraped_elements,
+		scraping_initiation_time=scraping_initiation_time,
+		exception_raised=exception_raised
+	))
 
 def is_vertical_scrollbar_present(driver: webdriver) -> bool:
 	"""
@@ -66,10 +358,48 @@ def is_vertical_scrollbar_present(driver: webdriver) -> bool:
 		return:
 			bool: whether scroll height > viewport height
 	"""
-	scroll_height = driver.execute_script("return document.documentElement.scrollHeight")
-	viewport_height = driver.execute_script("return document.documentElement.clientHeight")
 
-	return scroll_height>viewport_height
+	# every execute_script call is a full webdriver round-trip
+	# thus both heights are compared inside one script
+	# instead of fetching them with two separate calls
+	return driver.execute_script(_JS_SCROLLBAR_PRESENT)
+
+def scroll_to_bottom_if_scrollable(driver: webdriver) -> bool:
+	"""
+	Scroll to the end of the page when a vertical scrollbar is present
+
+	The scrollbar check and the scroll itself are fused into one script,
+	so the whole step costs a single webdriver round-trip
+	instead of three separate ones
+
+		param:
+			driver (webdriver): Selenium webdriver
+
+		return:
+			bool: whether the page was scrolled
+	"""
+
+	return driver.execute_script(_JS_SCROLL_TO_BOTTOM_IF_SCROLLABLE)
+
+def get_outer_html(driver: webdriver) -> str:
+	"""
+	Return the page's HTML through the devtools protocol
+
+	driver.page_source round-trips a json-encoded copy of the whole
+	document over Selenium's http bridge, while the devtools channel
+	ships the same payload in a single websocket frame
+	with far less encoding overhead on MB-sized pages
+
+		param:
+			driver (webdriver): Selenium webdriver
+
+		return:
+			str: serialized HTML of the current page
+	"""
+
+	root_node_id = driver.execute_cdp_cmd("DOM.getDocument", {"depth": 0})["root"]["nodeId"]
+
+	return driver.execute_cdp_cmd("DOM.getOuterHTML", {"nodeId": root_node_id})["outerHTML"]
 
 def wait_until_page_ready(driver: webdriver) -> None:
 	"""
@@ -79,16 +409,174 @@ def wait_until_page_ready(driver: webdriver) -> None:
 			driver (webdriver): Selenium webdriver
 	"""
 
+	# driver.get already blocks until the browser fires its load event
+	# thus a single check usually confirms readiness right away
+	# instead of paying WebDriverWait's polling round-trips (up to 60 over 30s)
+	if(driver.execute_script(_JS_PAGE_READY_STATE)=="complete"):
+		return
+
+	# the single check disagreed (e.g. a redirect restarted the load)
+	# fall back to polling until the page is ready
 	WebDriverWait(driver, 30).until(
-		lambda driver: driver.execute_script("return document.readyState")=="complete"
+		lambda driver: driver.execute_script(_JS_PAGE_READY_STATE)=="complete"
 	)
 
+def wait_until_scroll_height_stable(driver: webdriver, timeout: int=5) -> None:
+	"""
+	Command webdriver to wait until the page's scroll height stops growing
+
+	The previous height is stashed on the window object between polls,
+	thus two consecutive polls seeing the same height
+	means the lazy-loaded elements are settled
+
+		params:
+			driver (webdriver): Selenium webdriver
+			timeout (int): maximum seconds to wait, default=5
+	"""
+
+	try:
+		WebDriverWait(driver, timeout).until(
+			lambda driver: driver.execute_script(_JS_SCROLL_HEIGHT_STABLE)
+		)
+	except TimeoutException:
+		# the page kept growing (e.g. infinite scroll)
+		# whatever is loaded by now is enough to classify the site
+		pass
+
+# where the learned per-site scraping plans are persisted
+SITE_PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "site_profiles.json")
+
+@dataclass(slots=True)
+class ScrapePlan:
+	"""
+	Learned scraping plan for one site family
+
+	Gambling sites cluster into a few template families, thus once a
+	registered domain has been scraped the generic pipeline's discovery
+	work (scroll probing, captcha waits) can be skipped for the urls
+	of its family
+	"""
+
+	needs_scroll: bool = True
+	needs_captcha_wait: bool = True
+	max_wait: int = 10
+
+_site_profiles = None
+_site_profiles_lock = threading.Lock()
+
+def _load_site_profiles() -> dict:
+	"""
+	Return the site profiles, reading them from disk on first use
+
+		return:
+			dictionary mapping registered domains to their ScrapePlan
+	"""
+
+	global _site_profiles
+
+	if(_site_profiles is None):
+		try:
+			with open(SITE_PROFILES_PATH) as profiles_file:
+				_site_profiles = {
+					domain: ScrapePlan(**plan)
+					for domain, plan in json.load(profiles_file).items()
+				}
+		except (FileNotFoundError, json.JSONDecodeError):
+			_site_profiles = {}
+
+	return _site_profiles
+
+def get_scrape_plan(web_url: str) -> ScrapePlan:
+	"""
+	Return the learned scraping plan for the url's site family
+
+		param:
+			web_url (str): url of the web to scrape
+
+		return:
+			ScrapePlan of the url's registered domain, \
+			or None when the domain hasn't been scraped before
+	"""
+
+	domain = tldextract.extract(web_url).registered_domain
+
+	with _site_profiles_lock:
+		return _load_site_profiles().get(domain)
+
+def record_scrape_plan(web_url: str, needs_scroll: bool, needs_captcha_wait: bool) -> None:
+	"""
+	Learn a site family's scraping plan from an observed scrape
+
+	The plan is persisted so later runs skip the discovery work too
+
+		params:
+			web_url (str): url the observations come from
+			needs_scroll (bool): whether the page had to be scrolled
+			needs_captcha_wait (bool): whether the page showed a captcha challenge
+	"""
+
+	domain = tldextract.extract(web_url).registered_domain
+
+	if(not domain):
+		return
+
+	with _site_profiles_lock:
+		profiles = _load_site_profiles()
+		profiles[domain] = ScrapePlan(
+			needs_scroll=needs_scroll,
+			needs_captcha_wait=needs_captcha_wait
+		)
+
+		with open(SITE_PROFILES_PATH, "w") as profiles_file:
+			json.dump(
+				{domain: asdict(plan) for domain, plan in profiles.items()},
+				profiles_file,
+				indent=1
+			)
+
+# selectors of the well-known captcha / challenge widgets
+# (recaptcha, hcaptcha, cloudflare)
+CAPTCHA_SELECTOR = "iframe[src*='captcha'], iframe[src*='challenge'], #challenge-form"
+
+def wait_for_captcha_resolution(driver: webdriver, timeout: int=10) -> bool:
+	"""
+	Wait for a captcha challenge only when one is actually present
+
+	The old fixed wait taxed every page for the small minority
+	that show a captcha, now pages without a challenge
+	continue immediately
+
+		params:
+			driver (webdriver): Selenium webdriver
+			timeout (int): maximum seconds to wait for the challenge to clear, default=10
+
+		return:
+			bool: whether a challenge was present on the page
+	"""
+
+	if(not driver.find_elements(*provide_locator(By.CSS_SELECTOR, CAPTCHA_SELECTOR))):
+		return False
+
+	try:
+		WebDriverWait(driver, timeout).until(
+			EC.invisibility_of_element_located(
+				provide_locator(By.CSS_SELECTOR, CAPTCHA_SELECTOR)
+			)
+		)
+	except TimeoutException:
+		# the challenge didn't clear in time
+		# scrape whatever is rendered behind it
+		pass
+
+	return True
+
 def get_scraping_result(
 	web_url: str, 
 	is_gambling_site: bool, 
 	driver: webdriver,
 	df_row_count: int,
-	item_position: int
+	item_position: int,
+	force_js_rendering: bool=False
 ) -> dict:
 	"""
 	Return scraping result as dictionary
@@ -98,12 +586,19 @@ def get_scraping_result(
 			driver (webdriver): selenium webdriver
 			item_position (int): position of the item in the dataframe, default=None
 			df_row_count (int): count of dataframe rows, default=None
+			force_js_rendering (bool): whether to skip the static fetch \
+			and render the page with the webdriver right away, default=False
 
 		return:
 			dictonary containing scraping result \
 			using :provide_scraping_result_dict:`provide_scraping_result_dict function`
 	"""
 
+	# the initiation time is captured on entry
+	# taking it in the finally block recorded the *end* of the scrape,
+	# seconds after the scraping actually started
+	scraping_initiation_time = _now()
+
 	# set is_error to False to simplify value matching
 	is_error = True
 
@@ -111,6 +606,34 @@ def get_scraping_result(
 	exception_raised = None
 
 	try:
+		if(not force_js_rendering):
+			# pdfs, images and dead urls would still cost the whole browser
+			# pipeline, thus a cheap HEAD preflight weeds them out
+			# before any real work is invested
+			try:
+				exception_raised = preflight_web_url(web_url)
+			except httpx.HTTPError:
+				# hosts rejecting HEAD are left for the normal path
+				exception_raised = None
+
+			if(exception_raised is not None):
+				is_error = False
+				return
+
+			# many urls serve their full content as plain html
+			# those are fetched through the pooled http client
+			# which skips the browser (and its fixed waits) entirely
+			try:
+				scraped_elements = fetch_static(web_url)
+			except httpx.HTTPError:
+				# the host may block non-browser clients or simply be flaky
+				# let the webdriver try before reporting an error
+				scraped_elements = None
+
+		if(scraped_elements is not None):
+			is_error = False
+			return
+
 		# some gambling webpage are loaded slowly
 		# thus I use explicit wait function from selenium
 		# to wait until the web page is loaded successfully wihtin defined interval in seconds
@@ -118,44 +641,78 @@ def get_scraping_result(
 		# and the code will continue executing futher scripts
 		#** otherwise, it will raise timeout exception
 		# this method more effective than using time.sleep function
+		# the driver is long-lived, so the previous page's cookies
+		# and cache are wiped before loading the next url
+		reset_driver_state(driver)
 		driver.get(web_url)
 		wait_until_page_ready(driver)
 
+		# known site families skip the discovery work their template
+		# doesn't need, first encounters run the generic pipeline
+		# and record what they observed for the rest of the family
+		scrape_plan = get_scrape_plan(web_url)
+
 		# suppose the driver returned the web's elements
 		# there are some web page using verifying method to distinguish between human and bot (captcha)
 		#** the captcha takes time to load and the interval varies
-		# thus, I will wait using time.sleep function
-		# before retrieve web page's elements
-		time.sleep(5)
+		# only pages actually showing a challenge wait for it to clear
+		# the rest (the vast majority) continue immediately
+		captcha_present = False
+		if(scrape_plan is None or scrape_plan.needs_captcha_wait):
+			captcha_present = wait_for_captcha_resolution(
+				driver,
+				timeout=scrape_plan.max_wait if scrape_plan else 10
+			)
 
 		# some web pages are having scrollbar to load all of its elements
 		# to make sure all of the elements are loaded
 		# I will scroll to the end of it if vertical scroll bar is present
-		if(is_vertical_scrollbar_present(driver)):
-			driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+		was_scrolled = False
+		if(scrape_plan is None or scrape_plan.needs_scroll):
+			was_scrolled = scroll_to_bottom_if_scrollable(driver)
 
-		time.sleep(5)
+		# instead of sleeping a fixed 5 seconds after the scroll
+		# I will wait until the scroll height stops growing between polls
+		# which returns as soon as the lazy-loaded elements are settled
+		if(was_scrolled):
+			wait_until_scroll_height_stable(driver)
 
-		scraped_elements = driver.page_source
+		# keeping the raw page source would hold the full serialized html
+		# in memory for every scraped url
+		scraped_elements = compact_page_source(get_outer_html(driver))
+
+		if(scrape_plan is None):
+			record_scrape_plan(
+				web_url,
+				needs_scroll=was_scrolled,
+				needs_captcha_wait=captcha_present
+			)
 
 		is_error=False
 	except TimeoutException:
 		exception_raised = "Timeout Exception"
-		print("Error occurred: ", exception_raised)
+		log.warning("Error occurred: %s", exception_raised)
 	except Exception as e:
-		exception_raised = e
-		print(f"Error occurred: {e}")
+		# storing the exception object would keep its traceback
+		# and every frame's locals (driver payloads, lxml trees) alive
+		# a plain string lets all of that be collected
+		exception_raised = f"{type(e).__name__}: {e}"
+		log.warning("Error occurred: %s", exception_raised)
 	finally:
-		print(f"[{item_position}/{df_row_count}] scraping finished on {web_url}")
-		print("\tis error: ", is_error)
-		print("\texception: ", exception_raised)
+		# printing from the hot loop serializes the worker threads
+		# on the stdout lock, the logger formats lazily
+		# and its i/o happens off-thread (see setup_logger)
+		log.info(
+			"[%s/%s] scraping finished on %s (is error: %s, exception: %s)",
+			item_position, df_row_count, web_url, is_error, exception_raised
+		)
 
 		return provide_scraping_result_dict(
 			web_url=web_url,
 			is_gambling_site=is_gambling_site,
 			is_error=is_error,
 			scraped_elements=scraped_elements,
-			scraping_initiation_time=dt.now(),
+			scraping_initiation_time=scraping_initiation_time,
 			exception_raised=exception_raised
 		)
 
@@ -171,6 +728,11 @@ def get_crawling_scraping_result(web_url: str, driver: webdriver) -> dict:
 			using :provide_scraping_result_dict:`provide_scraping_result_dict function`
 	"""
 
+	# the initiation time is captured on entry
+	# taking it in the finally block recorded the *end* of the scrape,
+	# seconds after the scraping actually started
+	scraping_initiation_time = _now()
+
 	# set is_error to False to simplify value matching
 	is_error = True
 
@@ -190,53 +752,82 @@ def get_crawling_scraping_result(web_url: str, driver: webdriver) -> dict:
 		# suppose the driver returned the web's elements
 		# there are some web page using verifying method to distinguish between human and bot (captcha)
 		#** the captcha takes time to load and the interval varies
-		# thus, I will wait using time.sleep function
-		# before retrieve web page's elements
-		time.sleep(5)
+		# only pages actually showing a challenge wait for it to clear
+		# the rest (the vast majority) continue immediately
+		wait_for_captcha_resolution(driver)
 
 		# some web pages are having scrollbar to load all of its elements
 		# to make sure all of the elements are loaded
 		# I will scroll to the end of it if vertical scroll bar is present
-		if(is_vertical_scrollbar_present(driver)):
-			driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+		scroll_to_bottom_if_scrollable(driver)
 
-		time.sleep(5)
+		# instead of sleeping a fixed 5 seconds after the scroll
+		# I will wait until the scroll height stops growing between polls
+		# which returns as soon as the lazy-loaded elements are settled
+		wait_until_scroll_height_stable(driver)
 
-		scraped_elements = driver.page_source
+		# keeping the raw page source would hold the full serialized html
+		# in memory for every scraped url
+		scraped_elements = compact_page_source(get_outer_html(driver))
 
 		is_error=False
 	except TimeoutException:
 		exception_raised = "Timeout Exception"
-		print("Error occurred: ", exception_raised)
+		log.warning("Error occurred: %s", exception_raised)
 	except NoSuchElementException:
 		exception_raised = "The web is not loaded"
-		print("Error occurred: ", exception_raised)
+		log.warning("Error occurred: %s", exception_raised)
 	except Exception as e:
-		exception_raised = e
-		print(f"Error occurred: {e}")
+		# storing the exception object would keep its traceback
+		# and every frame's locals (driver payloads, lxml trees) alive
+		# a plain string lets all of that be collected
+		exception_raised = f"{type(e).__name__}: {e}"
+		log.warning("Error occurred: %s", exception_raised)
 	finally:
-		print(f"scraping finished on {web_url}")
-		print("\tis error: ", is_error)
-		print("\texception: ", exception_raised)
+		log.info(
+			"scraping finished on %s (is error: %s, exception: %s)",
+			web_url, is_error, exception_raised
+		)
+
+		# the crawled pages share the schema of the direct scrapes
+		# whether the web a gambling site is not known yet at crawl time
+		return provide_scraping_result_dict(
+			web_url=web_url,
+			is_gambling_site=None,
+			is_error=is_error,
+			scraped_elements=scraped_elements,
+			scraping_initiation_time=scraping_initiation_time,
+			exception_raised=exception_raised
+		)
 
-		return {
-			"web_url": web_url,
-			"is_error": is_error,
-			"scraped_elements": scraped_elements,
-			"scraping_initiation_time": dt.now(),
-			"exception_raised": exception_raised
-		}
 
+# url patterns of sub-resources (images, fonts, media, styling)
+# that carry none of the html the scraping needs
+# they are dropped at the network level when the webdriver is built
+BLOCKED_RESOURCE_URLS = [
+	"*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp",
+	"*.woff*", "*.mp4", "*.css"
+]
 
-def get_webdriver() -> webdriver:
+def _build_driver(block_media: bool=True) -> webdriver:
 	"""
 	Set-up webdriver object with options
 
+		param:
+			block_media (bool): whether to block image/font/media requests, \
+			disable it for sites whose gambling signal lives in images, default=True
+
 		return:
 			Selenium webdriver object with defined options
 	"""
 	options = webdriver.ChromeOptions()
 	# options.add_argument("--headless=new")
+
+	# with the default "normal" strategy driver.get blocks until
+	# every ad, tracker and image finished loading
+	# "eager" returns at DOMContentLoaded, which is all the scraping needs
+	options.page_load_strategy = "eager"
+
 	options.add_argument('--disable-gpu')
 	options.add_argument('--mute-audio')
 	options.add_argument('--ignore-certificate-errors')
@@ -245,6 +836,17 @@ def get_webdriver() -> webdriver:
 	options.add_argument('--log-level=3')
 	options.add_argument('--disable-web-security')
 
+	# blocking the requests (see BLOCKED_RESOURCE_URLS) stops the bytes,
+	# these prefs additionally stop the renderer from spending cpu
+	# decoding whatever images still slip through
+	if(block_media):
+		options.add_experimental_option("prefs", {
+			"profile.managed_default_content_settings.images": 2,
+			"profile.default_content_setting_values.notifications": 2,
+			"profile.default_content_setting_values.media_stream": 2
+		})
+		options.add_argument("--blink-settings=imagesEnabled=false")
+
 	# install adblocker
 	options.add_extension(os.path.abspath("adblock.crx"))
 
@@ -269,4 +871,315 @@ def get_webdriver() -> webdriver:
 	# switch back to first tab
 	driver.switch_to.window(driver.window_handles[0])
 
-	return driver
\ No newline at end of file
+	# drop the heavy sub-resources at the network level
+	# the pages load far less bytes and the waits get more stable
+	if(block_media):
+		driver.execute_cdp_cmd("Network.enable", {})
+		driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCE_URLS})
+
+	return driver
+
+# chrome start-up (extension install and welcome-tab dance included)
+# costs seconds per driver, thus one long-lived driver is cached
+# at module level instead of being rebuilt per call
+_driver_singleton = None
+
+def get_webdriver(block_media: bool=True) -> webdriver:
+	"""
+	Return the shared webdriver, building it on first use
+
+	Callers creating a driver per url would pay the whole Chrome
+	start-up on every page, the cached driver removes that cost
+	from the hot path entirely
+
+		param:
+			block_media (bool): whether to block image/font/media requests, \
+			only applied when the driver is first built, default=True
+
+		return:
+			Selenium webdriver shared across the module
+	"""
+
+	global _driver_singleton
+
+	if(_driver_singleton is None):
+		_driver_singleton = _build_driver(block_media=block_media)
+
+	return _driver_singleton
+
+def reset_driver_state(driver: webdriver) -> None:
+	"""
+	Clear the driver's cookies and browser cache
+
+	Reusing one driver across urls must not let one page's state
+	leak into the next scrape, thus the state is wiped between pages
+
+		param:
+			driver (webdriver): Selenium webdriver
+	"""
+
+	driver.delete_all_cookies()
+	driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+
+# count of pre-warmed webdrivers (and worker threads)
+# used when scraping urls concurrently
+#** scraping is i/o bound (network waits dominate)
+# so the throughput grows almost linearly with the worker count
+DRIVER_POOL_SIZE = 8
+
+# only one worker scrapes a given parent domain at a time
+# so a single host isn't hammered by every worker at once
+#** defaultdict creates the semaphore lazily
+# on the first url of each domain
+_domain_semaphores = defaultdict(threading.Semaphore)
+
+class WebDriverPool:
+	"""
+	Bounded pool of pre-warmed Selenium webdrivers
+
+	The drivers are created once up front and shared by the scraping workers,
+	so the expensive Chrome start-up is paid pool-size times
+	instead of once per url
+	"""
+
+	def __init__(self, size: int=DRIVER_POOL_SIZE):
+		"""
+			param:
+				size (int): count of webdrivers held by the pool, default=DRIVER_POOL_SIZE
+		"""
+
+		self.size = size
+		self._drivers = queue.Queue()
+
+		# every pool slot needs its own driver
+		# thus the pool pre-warms them directly
+		# instead of going through the shared singleton
+		for _ in range(size):
+			self._drivers.put(_build_driver())
+
+	def acquire(self) -> webdriver:
+		"""
+		Take a webdriver from the pool, waiting until one is available
+
+			return:
+				Selenium webdriver taken from the pool
+		"""
+
+		return self._drivers.get()
+
+	def release(self, driver: webdriver) -> None:
+		"""
+		Put a webdriver back into the pool
+
+			param:
+				driver (webdriver): Selenium webdriver taken from the pool
+		"""
+
+		self._drivers.put(driver)
+
+	def shutdown(self) -> None:
+		"""
+		Quit every webdriver held by the pool
+		"""
+
+		while(not self._drivers.empty()):
+			self._drivers.get_nowait().quit()
+
+def get_parent_domain(web_url: str) -> str:
+	"""
+	Return the url's parent (registered) domain used for the throttle
+
+	Subdomains of one site must share the same semaphore, thus the
+	registered domain is the key; ip addresses and local hosts have
+	no registered domain and fall back to the raw netloc
+
+		param:
+			web_url (str): url of the web to scrape
+
+		return:
+			str: registered domain of the url, or its lowercased netloc
+	"""
+
+	domain = tldextract.extract(web_url).registered_domain
+
+	return (domain or urlparse(web_url).netloc).lower()
+
+def get_scraping_result_with_pool(
+	driver_pool: WebDriverPool,
+	web_url: str,
+	is_gambling_site: bool,
+	df_row_count: int,
+	item_position: int
+) -> dict:
+	"""
+	Return scraping result using a webdriver taken from the pool
+
+		params:
+			driver_pool (WebDriverPool): pool the webdriver is taken from
+			web_url (str): url of the web to scrape
+			is_gambling_site (bool): whether the web a gambling site or not
+			df_row_count (int): count of dataframe rows
+			item_position (int): position of the item in the dataframe
+
+		return:
+			dictonary containing scraping result \
+			using :get_scraping_result:`get_scraping_result function`
+	"""
+
+	# cap the concurrency per parent domain
+	# before taking a webdriver from the pool
+	# so waiting on a busy domain doesn't hold a driver idle
+	with _domain_semaphores[get_parent_domain(web_url)]:
+		driver = driver_pool.acquire()
+
+		try:
+			return get_scraping_result(
+				web_url=web_url,
+				is_gambling_site=is_gambling_site,
+				driver=driver,
+				df_row_count=df_row_count,
+				item_position=item_position
+			)
+		finally:
+			driver_pool.release(driver)
+
+def get_scraping_result_concurrently(
+	web_urls: list,
+	is_gambling_site_flags: list,
+	driver_pool: WebDriverPool=None
+) -> list:
+	"""
+	Scrape the urls concurrently using a pool of webdrivers
+
+	Scraping one url at a time leaves the workers idle
+	during the network waits, thus I dispatch the urls
+	to a bounded pool of webdrivers through a thread pool
+	to scrape multiple urls at the same time
+
+		params:
+			web_urls (list): urls of the webs to scrape
+			is_gambling_site_flags (list): whether each web a gambling site or not
+			driver_pool (WebDriverPool): pool of webdrivers to use, \
+			created (and shut down) internally when not given, default=None
+
+		return:
+			list of dictionaries containing the scraping results, \
+			in the same order as the given urls
+	"""
+
+	own_pool = driver_pool is None
+	if(own_pool):
+		driver_pool = WebDriverPool()
+
+	df_row_count = len(web_urls)
+
+	try:
+		with ThreadPoolExecutor(max_workers=driver_pool.size) as executor:
+			return list(executor.map(
+				get_scraping_result_with_pool,
+				repeat(driver_pool),
+				web_urls,
+				is_gambling_site_flags,
+				repeat(df_row_count),
+				range(1, df_row_count+1)
+			))
+	finally:
+		if(own_pool):
+			driver_pool.shutdown()
+
+		# a batch leaves plenty of freed cycles behind
+		# (lxml trees, webdriver payloads), reclaim them
+		# before the next batch starts
+		gc.collect()
+
+def _store_scraping_result(scraping_result: dict) -> None:
+	"""
+	Write one scraping result to the database
+
+	Errored urls additionally land in the error report
+	so they can be retried later
+
+		param:
+			scraping_result (dict): scraping report of one url
+	"""
+
+	with get_db() as conn:
+		conn.execute(
+			"INSERT INTO prediction(web_url, is_gambling_site, scraping_time, is_error) "
+			"VALUES (%s, %s, %s, %s) "
+			"ON CONFLICT (web_url) DO UPDATE SET "
+			"is_gambling_site=EXCLUDED.is_gambling_site, "
+			"scraping_time=EXCLUDED.scraping_time, "
+			"is_error=EXCLUDED.is_error",
+			(
+				scraping_result["web_url"],
+				scraping_result["is_gambling_site"],
+				scraping_result["scraping_initiation_time"],
+				scraping_result["is_error"]
+			)
+		)
+
+		if(scraping_result["is_error"]):
+			conn.execute(
+				"INSERT INTO error_report(web_url, description) "
+				"VALUES (%s, %s) "
+				"ON CONFLICT (web_url) DO UPDATE SET description=EXCLUDED.description",
+				(scraping_result["web_url"], str(scraping_result["exception_raised"]))
+			)
+
+def scrape_and_store_concurrently(
+	web_urls: list,
+	is_gambling_site_flags: list,
+	driver_pool: WebDriverPool=None
+) -> None:
+	"""
+	Scrape the urls concurrently and stream the results into the database
+
+	Collecting every page's html in one list grows the working set
+	with the crawl size (easily gigabytes), thus each result is written
+	through the connection pool as soon as its future completes
+	and its html is dropped from memory right after,
+	keeping the working set at pool-size pages regardless of the crawl size
+
+		params:
+			web_urls (list): urls of the webs to scrape
+			is_gambling_site_flags (list): whether each web a gambling site or not
+			driver_pool (WebDriverPool): pool of webdrivers to use, \
+			created (and shut down) internally when not given, default=None
+	"""
+
+	own_pool = driver_pool is None
+	if(own_pool):
+		driver_pool = WebDriverPool()
+
+	df_row_count = len(web_urls)
+
+	def write_to_db(future):
+		scraping_result = future.result()
+
+		_store_scraping_result(scraping_result)
+
+		# the result is persisted now, release the big html string
+		scraping_result["scraped_elements"] = None
+
+	try:
+		with ThreadPoolExecutor(max_workers=driver_pool.size) as executor:
+			for item_position, (web_url, is_gambling_site) in \
+				enumerate(zip(web_urls, is_gambling_site_flags), start=1):
+				future = executor.submit(
+					get_scraping_result_with_pool,
+					driver_pool,
+					web_url,
+					is_gambling_site,
+					df_row_count,
+					item_position
+				)
+				future.add_done_callback(write_to_db)
+	finally:
+		if(own_pool):
+			driver_pool.shutdown()
+
+		# a batch leaves plenty of freed cycles behind
+		# (lxml trees, webdriver payloads), reclaim them
+		# before the next batch starts
+		gc.collect()
\ No newline at end of file